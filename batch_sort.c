@@ -0,0 +1,90 @@
+#include "sort_algorithms.h"
+
+// 插入排序 (小段排序内核)
+void insertion_sort(int arr[], int low, int high, PerformanceStats *stats) {
+    for (int i = low + 1; i <= high; i++) {
+        int key = arr[i];
+        int j = i - 1;
+
+        while (j >= low) {
+            if (stats) stats->comparisons++;
+            if (arr[j] <= key) break;
+            arr[j + 1] = arr[j];
+            if (stats) stats->swaps++;
+            j--;
+        }
+        arr[j + 1] = key;
+    }
+}
+
+// 混合快速排序 (短数组内核)
+// 三数取中 + Hoare划分，两侧扫描都在等于pivot处停下，重复键被均分到两侧，不会退化为O(n²)；
+// 子区间不超过BATCH_INSERTION_THRESHOLD时改用插入排序；
+// 只递归较小的一侧、循环处理较大的一侧，递归深度不超过log2(n)
+static void quick_sort_hybrid_depth(int arr[], int low, int high, PerformanceStats *stats, int depth) {
+    while (high - low + 1 > BATCH_INSERTION_THRESHOLD) {
+        TRACE_BEGIN(TRACE_PARTITION, depth, high - low + 1);
+        int pivot = arr[median_of_three(arr, low, high)];
+        int i = low - 1, j = high + 1;
+        while (1) {
+            do {
+                i++;
+                if (stats) stats->comparisons++;
+            } while (arr[i] < pivot);
+            do {
+                j--;
+                if (stats) stats->comparisons++;
+            } while (arr[j] > pivot);
+            if (i >= j) break;
+            int temp = arr[i];
+            arr[i] = arr[j];
+            arr[j] = temp;
+            if (stats) stats->swaps++;
+        }
+        TRACE_END(TRACE_PARTITION, depth, high - low + 1);
+        depth++;
+
+        // [low, j] <= pivot, [j+1, high] >= pivot
+        if (j - low < high - j) {
+            quick_sort_hybrid_depth(arr, low, j, stats, depth);
+            low = j + 1;
+        } else {
+            quick_sort_hybrid_depth(arr, j + 1, high, stats, depth);
+            high = j;
+        }
+    }
+    insertion_sort(arr, low, high, stats);
+}
+
+void quick_sort_hybrid(int arr[], int low, int high, PerformanceStats *stats) {
+    quick_sort_hybrid_depth(arr, low, high, stats, 0);
+}
+
+// 批量排序：values为紧凑存放的数据，第s段为[offsets[s], offsets[s+1])
+// 各段之间相互独立，使用动态调度并行排序，每个线程单独统计后归约
+void sort_segments(int values[], const long long offsets[], int num_segments, PerformanceStats *stats) {
+    long long comparisons = 0;
+    long long swaps = 0;
+
+    #pragma omp parallel reduction(+:comparisons, swaps)
+    {
+        PerformanceStats local;
+        init_performance_stats(&local);
+
+        #pragma omp for schedule(dynamic, BATCH_CHUNK_SEGMENTS)
+        for (int s = 0; s < num_segments; s++) {
+            int length = (int)(offsets[s + 1] - offsets[s]);
+            if (length > 1) {
+                quick_sort_hybrid(values + offsets[s], 0, length - 1, stats ? &local : NULL);
+            }
+        }
+
+        comparisons += local.comparisons;
+        swaps += local.swaps;
+    }
+
+    if (stats) {
+        stats->comparisons += comparisons;
+        stats->swaps += swaps;
+    }
+}
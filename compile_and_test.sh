@@ -2,9 +2,12 @@
 
 # 编译优化级别
 OPTIMIZATIONS=("O0" "O1" "O2" "O3" "Ofast")
+# 每个算法和数据规模的重复次数 (用于bootstrap置信区间)
+TRIALS=${TRIALS:-5}
 
 echo "=== Sorting Algorithms Benchmark ==="
 echo "Testing optimization levels: ${OPTIMIZATIONS[*]}"
+echo "Trials per algorithm/size: $TRIALS"
 echo ""
 
 # 切换到src目录
@@ -12,6 +15,8 @@ cd ../src
 
 # 清理之前的性能数据
 rm -f ../results/performance_data.csv
+rm -f ../results/batch_sort_data.csv
+rm -f ../results/sample_sort_phases.csv
 rm -f ../data/test_data_*.txt
 
 # 为每个优化级别编译和测试
@@ -20,7 +25,7 @@ for OPT in "${OPTIMIZATIONS[@]}"; do
     
     # 编译
     echo "Compiling with -$OPT..."
-    gcc -$OPT -fopenmp -o sort_test main.c quick_sort.c merge_sort.c utils.c
+    gcc -$OPT -fopenmp -o sort_test main.c quick_sort.c merge_sort.c sample_sort.c batch_sort.c trace.c utils.c
     
     if [ $? -ne 0 ]; then
         echo "Compilation failed for -$OPT"
@@ -29,12 +34,16 @@ for OPT in "${OPTIMIZATIONS[@]}"; do
     
     # 运行测试
     echo "Running tests..."
-    ./sort_test $OPT
+    ./sort_test $OPT $TRIALS
     
     echo "Completed -$OPT"
     echo ""
 done
 
+# 编译排序服务使用的共享库
+echo "Building libsort.so for sort_service.py..."
+gcc -O2 -fopenmp -shared -fPIC -o libsort.so quick_sort.c merge_sort.c sample_sort.c batch_sort.c trace.c utils.c
+
 # 返回脚本目录
 cd ../scripts
 
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+经验复杂度模型选择与容量规划
+在 n、n log n、n log² n、n^k (对数-对数回归) 和缓存分层分段模型之间
+按 AIC 或留一规模交叉验证选择最优模型，对模型常数做 bootstrap 置信区间，
+并把执行时间与内存峰值外推到目标数据规模
+"""
+
+import numpy as np
+import pandas as pd
+
+# 每个元素的字节数 (int)
+ELEMENT_BYTES = 4
+
+# 缓存层级容量 (字节)，超过最后一级视为主存
+CACHE_TIERS = [
+    ('L1', 32 * 1024),
+    ('L2', 1024 * 1024),
+    ('L3', 32 * 1024 * 1024),
+]
+
+
+def _relative_weights(values):
+    """相对误差权重: 执行时间跨越多个数量级，按 1/y 加权避免大规模数据主导拟合"""
+    values = np.asarray(values, dtype=float)
+    positive = values[values > 0]
+    floor = positive.min() if positive.size else 1.0
+    return 1.0 / np.where(values > 0, values, floor)
+
+
+class ComplexityModel:
+    """线性参数模型 y = a * f(n) + b"""
+
+    def __init__(self, name, label, basis):
+        self.name = name
+        self.label = label
+        self.basis = basis
+
+    def param_names(self, sizes):
+        return ['a', 'b']
+
+    def design(self, sizes, reference=None):
+        sizes = np.asarray(sizes, dtype=float)
+        return np.column_stack([self.basis(sizes), np.ones_like(sizes)])
+
+    def fit(self, sizes, values):
+        X = self.design(sizes)
+        w = _relative_weights(values)
+        params, *_ = np.linalg.lstsq(X * w[:, None], np.asarray(values, dtype=float) * w,
+                                     rcond=None)
+        return params
+
+    def predict(self, params, sizes, reference=None):
+        return self.design(sizes, reference) @ params
+
+
+class PowerLawModel(ComplexityModel):
+    """幂律模型 y = a * n^k，在对数-对数空间做线性回归"""
+
+    def __init__(self):
+        super().__init__('power', 'n^k', None)
+
+    def param_names(self, sizes):
+        return ['a', 'k']
+
+    def fit(self, sizes, values):
+        sizes = np.asarray(sizes, dtype=float)
+        values = np.asarray(values, dtype=float)
+        mask = values > 0
+        if mask.sum() < 2:
+            return np.array([0.0, 0.0])
+        k, log_a = np.polyfit(np.log(sizes[mask]), np.log(values[mask]), 1)
+        return np.array([np.exp(log_a), k])
+
+    def predict(self, params, sizes, reference=None):
+        a, k = params
+        return a * np.asarray(sizes, dtype=float) ** k
+
+
+class CacheTierModel(ComplexityModel):
+    """
+    缓存分层分段模型 y = c_tier * n log n + b
+    工作集 (n * ELEMENT_BYTES) 落在哪一级缓存就使用该级常数，
+    未观测到的层级沿用最近一个已观测层级的常数
+    """
+
+    def __init__(self):
+        super().__init__('cache_tier', 'n log n (缓存分层)', None)
+
+    @staticmethod
+    def tier_of(sizes):
+        working_set = np.asarray(sizes, dtype=float) * ELEMENT_BYTES
+        tiers = np.full(working_set.shape, len(CACHE_TIERS), dtype=int)
+        for idx, (_, capacity) in reversed(list(enumerate(CACHE_TIERS))):
+            tiers[working_set <= capacity] = idx
+        return tiers
+
+    @staticmethod
+    def tier_name(tier):
+        return CACHE_TIERS[tier][0] if tier < len(CACHE_TIERS) else 'DRAM'
+
+    def _observed(self, sizes):
+        return sorted(set(self.tier_of(sizes).tolist()))
+
+    def param_names(self, sizes):
+        return [f'c_{self.tier_name(t)}' for t in self._observed(sizes)] + ['b']
+
+    def design(self, sizes, reference=None):
+        sizes = np.asarray(sizes, dtype=float)
+        observed = self._observed(sizes if reference is None else reference)
+        tiers = self.tier_of(sizes)
+        # 将每个点映射到最近的已观测层级
+        nearest = np.array([min(observed, key=lambda o: abs(o - t)) for t in tiers])
+        X = np.zeros((sizes.size, len(observed) + 1))
+        n_log_n = sizes * np.log2(sizes)
+        for col, tier in enumerate(observed):
+            X[:, col] = np.where(nearest == tier, n_log_n, 0.0)
+        X[:, -1] = 1.0
+        return X
+
+    def predict(self, params, sizes, reference=None):
+        return self.design(sizes, reference) @ params
+
+
+def build_models():
+    """候选复杂度模型族"""
+    return [
+        ComplexityModel('linear', 'n', lambda n: n),
+        ComplexityModel('n_log_n', 'n log n', lambda n: n * np.log2(n)),
+        ComplexityModel('n_log2_n', 'n log² n', lambda n: n * np.log2(n) ** 2),
+        PowerLawModel(),
+        CacheTierModel(),
+    ]
+
+
+def _relative_sse(model, params, sizes, values, reference=None):
+    values = np.asarray(values, dtype=float)
+    residuals = (values - model.predict(params, sizes, reference)) * _relative_weights(values)
+    return float(np.sum(residuals ** 2))
+
+
+def aic_score(model, sizes, values):
+    """带小样本修正的 AIC (AICc)，残差为相对误差"""
+    params = model.fit(sizes, values)
+    n = len(values)
+    k = len(params)
+    sse = max(_relative_sse(model, params, sizes, values), 1e-300)
+    aic = n * np.log(sse / n) + 2 * k
+    if n - k - 1 > 0:
+        aic += 2 * k * (k + 1) / (n - k - 1)
+    return aic, params
+
+
+def cv_score(model, sizes, values):
+    """留一规模交叉验证: 每次留出一个数据规模的全部试验，返回平均相对平方误差"""
+    sizes = np.asarray(sizes, dtype=float)
+    values = np.asarray(values, dtype=float)
+    distinct = np.unique(sizes)
+    errors = []
+    for held_out in distinct:
+        train = sizes != held_out
+        if len(np.unique(sizes[train])) < 2:
+            continue
+        params = model.fit(sizes[train], values[train])
+        errors.append(_relative_sse(model, params, sizes[~train], values[~train],
+                                    reference=sizes[train]) / (~train).sum())
+    return (float(np.mean(errors)) if errors else np.inf), model.fit(sizes, values)
+
+
+def select_model(sizes, values, criterion='aic', models=None):
+    """
+    在候选模型中做模型选择
+    返回按得分升序排列的列表，每项包含 model、params、score
+    """
+    scorer = {'aic': aic_score, 'cv': cv_score}[criterion]
+    results = []
+    for model in models or build_models():
+        score, params = scorer(model, sizes, values)
+        results.append({'model': model, 'params': params, 'score': score})
+    results.sort(key=lambda r: r['score'])
+    return results
+
+
+def bootstrap_constants(model, sizes, values, n_boot=1000, ci=0.95, seed=0):
+    """
+    对模型常数做 bootstrap 置信区间
+    每个数据规模有多次试验时在规模内分层重抽样，否则对全部记录重抽样
+    返回 (摘要 DataFrame, 每次重抽样的参数矩阵)
+    """
+    rng = np.random.default_rng(seed)
+    sizes = np.asarray(sizes, dtype=float)
+    values = np.asarray(values, dtype=float)
+    groups = [np.flatnonzero(sizes == s) for s in np.unique(sizes)]
+    stratified = all(len(g) > 1 for g in groups)
+
+    samples = []
+    for _ in range(n_boot):
+        if stratified:
+            idx = np.concatenate([rng.choice(g, size=len(g)) for g in groups])
+        else:
+            idx = rng.integers(0, len(sizes), size=len(sizes))
+        if len(np.unique(sizes[idx])) < 2:
+            continue
+        params = model.fit(sizes[idx], values[idx])
+        if len(params) == len(model.param_names(sizes)):
+            samples.append(params)
+    samples = np.array(samples)
+
+    estimate = model.fit(sizes, values)
+    alpha = (1 - ci) / 2
+    lower = np.quantile(samples, alpha, axis=0) if len(samples) else estimate
+    upper = np.quantile(samples, 1 - alpha, axis=0) if len(samples) else estimate
+    summary = pd.DataFrame({
+        'Parameter': model.param_names(sizes),
+        'Estimate': estimate,
+        'Lower': lower,
+        'Upper': upper,
+    })
+    return summary, samples
+
+
+def extrapolate(sizes, values, target_sizes, criterion='aic', n_boot=1000, ci=0.95, seed=0):
+    """
+    选择最优模型并外推到目标规模
+    预测区间来自 bootstrap 参数样本的预测分位数
+    """
+    sizes = np.asarray(sizes, dtype=float)
+    values = np.asarray(values, dtype=float)
+    target_sizes = np.asarray(target_sizes, dtype=float)
+
+    if not np.any(values > 0):
+        zeros = np.zeros_like(target_sizes)
+        return None, pd.DataFrame({'DataSize': target_sizes.astype(int), 'Predicted': zeros,
+                                   'Lower': zeros, 'Upper': zeros})
+
+    best = select_model(sizes, values, criterion)[0]
+    model = best['model']
+    _, samples = bootstrap_constants(model, sizes, values, n_boot, ci, seed)
+    predicted = model.predict(best['params'], target_sizes, reference=sizes)
+    if len(samples):
+        boot_pred = np.array([model.predict(p, target_sizes, reference=sizes) for p in samples])
+        alpha = (1 - ci) / 2
+        lower = np.quantile(boot_pred, alpha, axis=0)
+        upper = np.quantile(boot_pred, 1 - alpha, axis=0)
+    else:
+        lower = upper = predicted
+    return model, pd.DataFrame({'DataSize': target_sizes.astype(int), 'Predicted': predicted,
+                                'Lower': lower, 'Upper': upper})
+
+
+def _linear_memory(sizes, values, target_sizes):
+    """按最大已测规模的每元素字节数线性外推内存峰值"""
+    largest = np.argmax(sizes)
+    predicted = values[largest] / sizes[largest] * np.asarray(target_sizes, dtype=float)
+    return pd.DataFrame({'DataSize': np.asarray(target_sizes).astype(int), 'Predicted': predicted,
+                         'Lower': predicted, 'Upper': predicted})
+
+
+def capacity_plan(df, target_sizes, optimization='O2', criterion='aic', n_boot=1000, ci=0.95):
+    """
+    对每个算法的执行时间和内存峰值做外推，返回容量规划表
+    内存使用 PeakMemory (同时占用的临时内存峰值)，MemoryUsage 是累计分配量，不能用于容量规划；
+    峰值为 0 的规模走的是原地回退路径，与目标规模的实现不同，不参与内存拟合
+    """
+    data = df[df['Optimization'] == optimization]
+    metrics = ['Time'] + (['PeakMemory'] if 'PeakMemory' in data.columns else [])
+    frames = []
+    for algo in data['Algorithm'].unique():
+        algo_data = data[data['Algorithm'] == algo]
+        if algo_data['DataSize'].nunique() < 3:
+            continue
+        for metric in metrics:
+            fit_data = algo_data
+            if metric == 'PeakMemory':
+                fit_data = algo_data[algo_data[metric] > 0]
+            if fit_data.empty:
+                model, table = extrapolate(algo_data['DataSize'], algo_data[metric], target_sizes)
+                label = '无 (恒为 0)'
+            elif fit_data['DataSize'].nunique() < 3:
+                table = _linear_memory(fit_data['DataSize'].values.astype(float),
+                                       fit_data[metric].values.astype(float), target_sizes)
+                label = 'n (按最大规模每元素字节数)'
+            else:
+                model, table = extrapolate(fit_data['DataSize'], fit_data[metric], target_sizes,
+                                           criterion, n_boot, ci)
+                label = model.label if model else '无 (恒为 0)'
+            table.insert(0, 'Algorithm', algo)
+            table.insert(1, 'Metric', metric)
+            table.insert(2, 'Model', label)
+            frames.append(table)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def report(df, optimization='O2', criterion='aic', n_boot=1000):
+    """打印每个算法的模型选择结果与常数置信区间"""
+    data = df[df['Optimization'] == optimization]
+    for algo in data['Algorithm'].unique():
+        algo_data = data[data['Algorithm'] == algo]
+        if algo_data['DataSize'].nunique() < 3:
+            print(f"⚠️  {algo}: 数据规模不足 3 个，跳过")
+            continue
+        sizes = algo_data['DataSize'].values
+        times = algo_data['Time'].values
+        ranking = select_model(sizes, times, criterion)
+
+        print(f"\n{algo} ({len(times)} 次试验, {algo_data['DataSize'].nunique()} 个规模)")
+        for entry in ranking:
+            print(f"  {entry['model'].label:<20} {criterion.upper()} = {entry['score']:.4g}")
+
+        best = ranking[0]['model']
+        summary, _ = bootstrap_constants(best, sizes, times, n_boot)
+        print(f"  最优模型: {best.label}")
+        print(summary.to_string(index=False, float_format=lambda v: f'{v:.4g}'))
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='经验复杂度模型选择与容量规划')
+    parser.add_argument('--data', default='../results/performance_data.csv')
+    parser.add_argument('--optimization', default='O2')
+    parser.add_argument('--criterion', choices=['aic', 'cv'], default='aic')
+    parser.add_argument('--bootstrap', type=int, default=1000)
+    parser.add_argument('--targets', type=int, nargs='+', default=[10**6, 10**7, 10**8])
+    parser.add_argument('--output', default='../results/capacity_planning.csv')
+    args = parser.parse_args()
+
+    try:
+        df = pd.read_csv(args.data)
+    except FileNotFoundError:
+        print("❌ 性能数据文件未找到，请先运行测试程序")
+        return
+
+    report(df, args.optimization, args.criterion, args.bootstrap)
+
+    plan = capacity_plan(df, args.targets, args.optimization, args.criterion, args.bootstrap)
+    if plan.empty:
+        return
+    print("\n📈 容量规划 (外推):")
+    print(plan.to_string(index=False, float_format=lambda v: f'{v:.4g}'))
+    plan.to_csv(args.output, index=False)
+    print(f"\n✅ 容量规划结果已保存为 '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
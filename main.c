@@ -2,6 +2,26 @@
 
 #define MAX_SIZE 1000000
 
+// 批量排序测试的段长度范围: [16, 16 << 8)，即16~4095
+#define BATCH_MIN_LENGTH 16
+#define BATCH_OCTAVES 8
+#define BATCH_SEED 20240601
+
+typedef struct {
+    const char *name;
+    const char *csv_name;
+    void (*sort_func)(int[], int, int, PerformanceStats*);
+} SortAlgorithm;
+
+static const SortAlgorithm algorithms[] = {
+    {"Quick Sort (Recursive)", "QuickSort_Recursive", quick_sort_recursive},
+    {"Quick Sort (Non-Recursive)", "QuickSort_NonRecursive", quick_sort_non_recursive},
+    {"Merge Sort (Sequential)", "MergeSort_Sequential", merge_sort_sequential},
+    {"Merge Sort (Parallel)", "MergeSort_Parallel", merge_sort_parallel},
+    {"Sample Sort (Parallel)", "SampleSort_Parallel", sample_sort_parallel},
+};
+static const int num_algorithms = sizeof(algorithms) / sizeof(algorithms[0]);
+
 void test_sort_algorithm(const char *name, 
                         void (*sort_func)(int[], int, int, PerformanceStats*), 
                         int arr[], 
@@ -48,32 +68,167 @@ void save_performance_data(const char *filename,
                           int size, 
                           const char *algorithm,
                           const PerformanceStats *stats) {
+    // 以追加模式打开总会创建文件，需先检查文件是否已存在再决定是否写表头
+    FILE *existing = fopen(filename, "r");
     FILE *file = fopen(filename, "a");
     if (file == NULL) {
-        file = fopen(filename, "w");
-        fprintf(file, "Optimization,DataSize,Algorithm,Time,Comparisons,Swaps,MemoryUsage\n");
+        if (existing) fclose(existing);
+        return;
+    }
+    if (existing == NULL) {
+        fprintf(file, "Optimization,DataSize,Algorithm,Time,Comparisons,Swaps,MemoryUsage,PeakMemory\n");
+    } else {
+        fclose(existing);
     }
     
-    fprintf(file, "%s,%d,%s,%.6f,%lld,%lld,%lld\n", 
+    fprintf(file, "%s,%d,%s,%.6f,%lld,%lld,%lld,%lld\n", 
             optimization, size, algorithm, stats->time, 
-            stats->comparisons, stats->swaps, stats->memory_usage);
+            stats->comparisons, stats->swaps, stats->memory_usage, stats->peak_memory);
     
     fclose(file);
 }
 
+// 样本排序分阶段计时，结果追加到../results/sample_sort_phases.csv
+void report_sample_sort_phases(const char *optimization, int original[], int size, int trials) {
+    // 小于阈值时样本排序直接退化为顺序快速排序，没有分阶段数据
+    if (size < SAMPLE_SORT_THRESHOLD) return;
+    
+    printf("Sample Sort phases (%d elements):\n", size);
+    
+    int *test_arr = (int*)malloc(size * sizeof(int));
+    const char *filename = "../results/sample_sort_phases.csv";
+    FILE *existing = fopen(filename, "r");
+    FILE *file = fopen(filename, "a");
+    if (existing == NULL && file != NULL) {
+        fprintf(file, "Optimization,DataSize,Threads,Buckets,Sampling,Classification,Exchange,LocalSort\n");
+    }
+    if (existing) fclose(existing);
+    
+    for (int t = 0; t < trials; t++) {
+        SampleSortPhases phases;
+        copy_array(test_arr, original, size);
+        sample_sort_parallel_phased(test_arr, 0, size - 1, NULL, &phases);
+        
+        printf("  Threads: %d, Buckets: %d\n", phases.threads, phases.buckets);
+        printf("  Sampling: %.6f  Classification: %.6f  Exchange: %.6f  Local sort: %.6f seconds\n",
+               phases.sampling, phases.classification, phases.exchange, phases.local_sort);
+        
+        if (file) {
+            fprintf(file, "%s,%d,%d,%d,%.6f,%.6f,%.6f,%.6f\n", optimization, size,
+                    phases.threads, phases.buckets, phases.sampling, phases.classification,
+                    phases.exchange, phases.local_sort);
+        }
+    }
+    
+    if (file) fclose(file);
+    free(test_arr);
+    printf("\n");
+}
+
+// 批量排序测试：生成num_segments个长度按对数近似均匀分布的独立段，
+// 对比逐段调用快速排序与sort_segments的吞吐量，结果追加到../results/batch_sort_data.csv
+// 使用固定随机种子，保证不同优化级别测试的是同一组数据
+void test_batch_sort(const char *optimization, int num_segments, int trials) {
+    printf("Testing Batch Sort with %d segments...\n", num_segments);
+    
+    srand(BATCH_SEED + num_segments);
+    long long *offsets = (long long*)malloc((num_segments + 1) * sizeof(long long));
+    offsets[0] = 0;
+    for (int s = 0; s < num_segments; s++) {
+        // 先随机选择一个倍频程，再在倍频程内均匀取值
+        int octave = BATCH_MIN_LENGTH << (rand() % BATCH_OCTAVES);
+        int length = octave + rand() % octave;
+        offsets[s + 1] = offsets[s] + length;
+    }
+    long long total = offsets[num_segments];
+    
+    int *original = (int*)malloc(total * sizeof(int));
+    int *values = (int*)malloc(total * sizeof(int));
+    for (long long i = 0; i < total; i++) {
+        original[i] = rand() % 10000;
+    }
+    
+    const char *filename = "../results/batch_sort_data.csv";
+    FILE *existing = fopen(filename, "r");
+    FILE *file = fopen(filename, "a");
+    if (existing == NULL && file != NULL) {
+        fprintf(file, "Optimization,Segments,Elements,Trial,BaselineTime,BatchTime,"
+                      "BaselineSegmentsPerSec,BatchSegmentsPerSec,Comparisons,Swaps\n");
+    }
+    if (existing) fclose(existing);
+    
+    PerformanceStats stats;
+    for (int t = 0; t < trials; t++) {
+        // 基线：逐段调用快速排序
+        memcpy(values, original, total * sizeof(int));
+        double start_time = omp_get_wtime();
+        for (int s = 0; s < num_segments; s++) {
+            quick_sort_recursive(values + offsets[s], 0, (int)(offsets[s + 1] - offsets[s]) - 1, NULL);
+        }
+        double baseline_time = omp_get_wtime() - start_time;
+        
+        // 批量接口 (与基线一样不统计比较/交换次数，统计在计时之外单独运行一次)
+        memcpy(values, original, total * sizeof(int));
+        start_time = omp_get_wtime();
+        sort_segments(values, offsets, num_segments, NULL);
+        double batch_time = omp_get_wtime() - start_time;
+        
+        if (t == 0) {
+            int *counted = (int*)malloc(total * sizeof(int));
+            memcpy(counted, original, total * sizeof(int));
+            init_performance_stats(&stats);
+            sort_segments(counted, offsets, num_segments, &stats);
+            free(counted);
+        }
+        
+        int sorted = 1;
+        for (int s = 0; s < num_segments && sorted; s++) {
+            sorted = is_sorted(values + offsets[s], (int)(offsets[s + 1] - offsets[s]));
+        }
+        
+        double baseline_rate = baseline_time > 0 ? num_segments / baseline_time : 0.0;
+        double batch_rate = batch_time > 0 ? num_segments / batch_time : 0.0;
+        printf("  Elements: %lld\n", total);
+        printf("  Per-segment quick sort: %.6f seconds (%.0f segments/s)\n", baseline_time, baseline_rate);
+        printf("  Batch sort: %.6f seconds (%.0f segments/s)\n", batch_time, batch_rate);
+        printf("  Sorted: %s\n", sorted ? "Yes" : "No");
+        
+        if (file) {
+            fprintf(file, "%s,%d,%lld,%d,%.6f,%.6f,%.1f,%.1f,%lld,%lld\n", optimization,
+                    num_segments, total, t, baseline_time, batch_time, baseline_rate, batch_rate,
+                    stats.comparisons, stats.swaps);
+        }
+    }
+    
+    if (file) fclose(file);
+    free(original);
+    free(values);
+    free(offsets);
+    printf("\n");
+}
+
 int main(int argc, char *argv[]) {
     if (argc < 2) {
-        printf("Usage: %s <optimization_level>\n", argv[0]);
+        printf("Usage: %s <optimization_level> [trials] [sample_sort_size]\n", argv[0]);
         printf("Optimization levels: O0, O1, O2, O3, Ofast\n");
+        printf("trials: repetitions per algorithm and size (default 1)\n");
+        printf("sample_sort_size: extra large size for sample sort phase timing (e.g. 100000000)\n");
+        printf("Set SORT_TRACE=1 to export Chrome trace files to ../results/trace_*.json\n");
         return 1;
     }
     
     char *optimization = argv[1];
+    int trials = (argc >= 3) ? atoi(argv[2]) : 1;
+    if (trials < 1) trials = 1;
+    int sample_sort_size = (argc >= 4) ? atoi(argv[3]) : 0;
+    // 设置环境变量SORT_TRACE=1时导出每个算法的Chrome Trace文件
+    int tracing = getenv("SORT_TRACE") != NULL && atoi(getenv("SORT_TRACE")) != 0;
     int sizes[] = {100, 1000, 10000, 100000};
     int num_sizes = sizeof(sizes) / sizeof(sizes[0]);
     
     printf("=== Sorting Algorithms Performance Test ===\n");
-    printf("Optimization Level: %s\n\n", optimization);
+    printf("Optimization Level: %s\n", optimization);
+    printf("Trials: %d\n\n", trials);
     
     PerformanceStats stats;
     
@@ -98,35 +253,58 @@ int main(int argc, char *argv[]) {
             continue;
         }
         
-        // 测试各种排序算法
-        test_sort_algorithm("Quick Sort (Recursive)", 
-                           quick_sort_recursive, 
-                           original_arr, size, original_arr, &stats);
-        save_performance_data("../results/performance_data.csv", optimization, size, 
-                             "QuickSort_Recursive", &stats);
-        
-        test_sort_algorithm("Quick Sort (Non-Recursive)", 
-                           quick_sort_non_recursive, 
-                           original_arr, size, original_arr, &stats);
-        save_performance_data("../results/performance_data.csv", optimization, size, 
-                             "QuickSort_NonRecursive", &stats);
-        
-        test_sort_algorithm("Merge Sort (Sequential)", 
-                           merge_sort_sequential, 
-                           original_arr, size, original_arr, &stats);
-        save_performance_data("../results/performance_data.csv", optimization, size, 
-                             "MergeSort_Sequential", &stats);
+        // 测试各种排序算法，每个算法重复 trials 次，逐次记录以便做 bootstrap 分析
+        for (int a = 0; a < num_algorithms; a++) {
+            // 开启跟踪时在正式试验之前额外运行一次带跟踪的排序，
+            // 该次运行不写入performance_data.csv，正式试验的计时不受跟踪开销影响
+            if (tracing) {
+                trace_enable(0);
+                test_sort_algorithm(algorithms[a].name, 
+                                   algorithms[a].sort_func, 
+                                   original_arr, size, original_arr, &stats);
+                trace_disable();
+                char trace_file[100];
+                sprintf(trace_file, "../results/trace_%s_%d.json", algorithms[a].csv_name, size);
+                trace_export_chrome(trace_file);
+            }
+            for (int t = 0; t < trials; t++) {
+                test_sort_algorithm(algorithms[a].name, 
+                                   algorithms[a].sort_func, 
+                                   original_arr, size, original_arr, &stats);
+                save_performance_data("../results/performance_data.csv", optimization, size, 
+                                     algorithms[a].csv_name, &stats);
+            }
+        }
         
-        test_sort_algorithm("Merge Sort (Parallel)", 
-                           merge_sort_parallel, 
-                           original_arr, size, original_arr, &stats);
-        save_performance_data("../results/performance_data.csv", optimization, size, 
-                             "MergeSort_Parallel", &stats);
+        report_sample_sort_phases(optimization, original_arr, size, trials);
         
         free(original_arr);
         printf("\n");
     }
     
+    // 大规模样本排序分阶段计时 (用于多核扩展性测试，数据在内存中生成)
+    if (sample_sort_size > 0) {
+        printf("Testing sample sort scaling with %d elements:\n", sample_sort_size);
+        printf("========================\n");
+        int *large_arr = (int*)malloc((size_t)sample_sort_size * sizeof(int));
+        for (int i = 0; i < sample_sort_size; i++) {
+            large_arr[i] = rand();
+        }
+        report_sample_sort_phases(optimization, large_arr, sample_sort_size, trials);
+        free(large_arr);
+    }
+    
+    // 批量排序测试 (大量独立短数组)
+    printf("Testing batch sort of independent segments:\n");
+    printf("========================\n");
+    int segment_counts[] = {100, 1000, 10000};
+    int num_segment_counts = sizeof(segment_counts) / sizeof(segment_counts[0]);
+    for (int i = 0; i < num_segment_counts; i++) {
+        test_batch_sort(optimization, segment_counts[i], trials);
+    }
+    
+    trace_free();
     printf("Performance data saved to ../results/performance_data.csv\n");
+    printf("Batch sort data saved to ../results/batch_sort_data.csv\n");
     return 0;
 }
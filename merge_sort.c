@@ -5,7 +5,7 @@ void merge(int arr[], int left, int mid, int right, PerformanceStats *stats) {
     int n1 = mid - left + 1;
     int n2 = right - mid;
     
-    if (stats) stats->memory_usage += (n1 + n2) * sizeof(int);
+    record_memory_alloc(stats, (n1 + n2) * sizeof(int));
     
     // 创建临时数组
     int *L = (int*)malloc(n1 * sizeof(int));
@@ -49,22 +49,30 @@ void merge(int arr[], int left, int mid, int right, PerformanceStats *stats) {
     
     free(L);
     free(R);
+    record_memory_free(stats, (n1 + n2) * sizeof(int));
 }
 
-// 顺序归并排序
-void merge_sort_sequential(int arr[], int left, int right, PerformanceStats *stats) {
+// 顺序归并排序 (带递归深度，用于跟踪)
+static void merge_sort_sequential_depth(int arr[], int left, int right, PerformanceStats *stats, int depth) {
     if (left < right) {
         int mid = left + (right - left) / 2;
         
-        merge_sort_sequential(arr, left, mid, stats);
-        merge_sort_sequential(arr, mid + 1, right, stats);
+        merge_sort_sequential_depth(arr, left, mid, stats, depth + 1);
+        merge_sort_sequential_depth(arr, mid + 1, right, stats, depth + 1);
         
+        TRACE_BEGIN(TRACE_MERGE, depth, right - left + 1);
         merge(arr, left, mid, right, stats);
+        TRACE_END(TRACE_MERGE, depth, right - left + 1);
     }
 }
 
-// 并行归并排序
-void merge_sort_parallel(int arr[], int left, int right, PerformanceStats *stats) {
+// 顺序归并排序
+void merge_sort_sequential(int arr[], int left, int right, PerformanceStats *stats) {
+    merge_sort_sequential_depth(arr, left, right, stats, 0);
+}
+
+// 并行归并排序 (带递归深度，用于跟踪)
+static void merge_sort_parallel_depth(int arr[], int left, int right, PerformanceStats *stats, int depth) {
     if (left < right) {
         int mid = left + (right - left) / 2;
         
@@ -73,16 +81,23 @@ void merge_sort_parallel(int arr[], int left, int right, PerformanceStats *stats
             #pragma omp parallel sections
             {
                 #pragma omp section
-                merge_sort_parallel(arr, left, mid, stats);
+                merge_sort_parallel_depth(arr, left, mid, stats, depth + 1);
                 
                 #pragma omp section
-                merge_sort_parallel(arr, mid + 1, right, stats);
+                merge_sort_parallel_depth(arr, mid + 1, right, stats, depth + 1);
             }
         } else {
-            merge_sort_sequential(arr, left, mid, stats);
-            merge_sort_sequential(arr, mid + 1, right, stats);
+            merge_sort_sequential_depth(arr, left, mid, stats, depth + 1);
+            merge_sort_sequential_depth(arr, mid + 1, right, stats, depth + 1);
         }
         
+        TRACE_BEGIN(TRACE_MERGE, depth, right - left + 1);
         merge(arr, left, mid, right, stats);
+        TRACE_END(TRACE_MERGE, depth, right - left + 1);
     }
 }
+
+// 并行归并排序
+void merge_sort_parallel(int arr[], int left, int right, PerformanceStats *stats) {
+    merge_sort_parallel_depth(arr, left, right, stats, 0);
+}
@@ -8,10 +8,11 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns
-from scipy.optimize import curve_fit
 import os
 from datetime import datetime
 
+import complexity_fitting
+
 # 设置图表风格
 plt.style.use('seaborn-v0_8-whitegrid')
 sns.set_palette("husl")
@@ -23,7 +24,15 @@ class SortingPerformanceAnalyzer:
             'QuickSort_Recursive': 'O(n log n)',
             'QuickSort_NonRecursive': 'O(n log n)',
             'MergeSort_Sequential': 'O(n log n)',
-            'MergeSort_Parallel': 'O(n log n)'
+            'MergeSort_Parallel': 'O(n log n)',
+            'SampleSort_Parallel': 'O(n log n)'
+        }
+        self.algorithm_types = {
+            'QuickSort_Recursive': '快速排序',
+            'QuickSort_NonRecursive': '快速排序',
+            'MergeSort_Sequential': '归并排序',
+            'MergeSort_Parallel': '归并排序',
+            'SampleSort_Parallel': '样本排序'
         }
         
     def load_data(self, filename='../results/performance_data.csv'):
@@ -52,9 +61,7 @@ class SortingPerformanceAnalyzer:
         self.df['MemoryPerElement'] = self.df['MemoryUsage'] / self.df['DataSize']
         
         # 添加算法类型分类
-        self.df['AlgorithmType'] = self.df['Algorithm'].apply(
-            lambda x: '快速排序' if 'Quick' in x else '归并排序'
-        )
+        self.df['AlgorithmType'] = self.df['Algorithm'].map(self.algorithm_types).fillna('其他')
         
         print("✅ 数据预处理完成!")
     
@@ -108,15 +115,17 @@ class SortingPerformanceAnalyzer:
         if self.df is None:
             return
         
-        fig, axes = plt.subplots(2, 2, figsize=(12, 10))
-        fig.suptitle('编译优化级别对排序算法性能的影响分析', fontsize=14, fontweight='bold')
-        
         algorithms = self.df['Algorithm'].unique()
         optimizations = self.df['Optimization'].unique()
         
+        cols = min(2, len(algorithms))
+        rows = int(np.ceil(len(algorithms) / cols))
+        fig, axes = plt.subplots(rows, cols, figsize=(6 * cols, 5 * rows), squeeze=False)
+        fig.suptitle('编译优化级别对排序算法性能的影响分析', fontsize=14, fontweight='bold')
+        
         # 1. 执行时间对比
         for i, algo in enumerate(algorithms):
-            ax = axes[i//2, i%2]
+            ax = axes[i // cols, i % cols]
             algo_data = self.df[self.df['Algorithm'] == algo]
             
             for opt in optimizations:
@@ -134,6 +143,9 @@ class SortingPerformanceAnalyzer:
             ax.legend(title='优化级别', fontsize=8)
             ax.grid(True, alpha=0.3)
         
+        for j in range(len(algorithms), rows * cols):
+            axes[j // cols, j % cols].set_visible(False)
+        
         plt.tight_layout()
         plt.savefig('../results/optimization_impact.pdf', bbox_inches='tight', dpi=300)
         plt.savefig('../results/optimization_impact.png', bbox_inches='tight', dpi=300)
@@ -151,7 +163,7 @@ class SortingPerformanceAnalyzer:
         fig.suptitle('排序算法性能对比分析 (O2优化级别)', fontsize=14, fontweight='bold')
         
         metrics = ['Time', 'Comparisons', 'Swaps', 'MemoryUsage']
-        metric_names = ['执行时间 (秒)', '比较次数', '交换次数', '内存使用 (字节)']
+        metric_names = ['执行时间 (秒)', '比较次数', '交换次数', '累计临时分配 (字节)']
         scales = ['log', 'log', 'log', 'log']
         
         for idx, (metric, name, scale) in enumerate(zip(metrics, metric_names, scales)):
@@ -179,83 +191,44 @@ class SortingPerformanceAnalyzer:
         plt.show()
     
     def theoretical_complexity_analysis(self):
-        """理论时间复杂度分析"""
+        """理论时间复杂度分析 (基于逐次试验数据的模型选择)"""
         if self.df is None:
             return
         
-        # 理论复杂度函数
-        def n_log_n(x, a, b):
-            return a * x * np.log(x) + b
-        
-        def n_squared(x, a, b):
-            return a * x * x + b
+        o2_data = self.df[self.df['Optimization'] == 'O2']
+        algorithms = o2_data['Algorithm'].unique()
+        if len(algorithms) == 0:
+            return
         
-        fig, axes = plt.subplots(2, 2, figsize=(12, 10))
+        cols = min(2, len(algorithms))
+        rows = int(np.ceil(len(algorithms) / cols))
+        fig, axes = plt.subplots(rows, cols, figsize=(6 * cols, 5 * rows), squeeze=False)
         fig.suptitle('排序算法时间复杂度验证分析', fontsize=14, fontweight='bold')
         
-        algorithms = self.df['Algorithm'].unique()
-        o2_data = self.df[self.df['Optimization'] == 'O2']
-        
         for i, algo in enumerate(algorithms):
-            ax = axes[i//2, i%2]
+            ax = axes[i // cols, i % cols]
             algo_data = o2_data[o2_data['Algorithm'] == algo]
             
-            if len(algo_data) < 3:
+            if algo_data['DataSize'].nunique() < 3:
                 continue
             
-            # 实际测量数据
-            sizes = algo_data['DataSize'].unique()
-            times = []
+            # 实际测量数据 (每次试验一个点)
+            sizes = algo_data['DataSize'].values
+            times = algo_data['Time'].values
             
-            for size in sizes:
-                time_val = algo_data[algo_data['DataSize'] == size]['Time'].mean()
-                times.append(time_val)
+            ax.scatter(sizes, times, color='red', s=30, zorder=5, 
+                      label='实测数据', alpha=0.5)
             
-            sizes = np.array(sizes)
-            times = np.array(times)
+            # 按 AIC 对候选模型排序，绘制前两名
+            ranking = complexity_fitting.select_model(sizes, times, 'aic')
+            sizes_fit = np.logspace(np.log10(sizes.min()), np.log10(sizes.max()), 100)
+            for rank, (entry, style) in enumerate(zip(ranking[:2], ['b-', 'g--'])):
+                model = entry['model']
+                times_fit = model.predict(entry['params'], sizes_fit, reference=sizes)
+                ax.plot(sizes_fit, times_fit, style, linewidth=2 - rank, alpha=1 - 0.3 * rank,
+                       label=f'{model.label} 拟合 (AIC = {entry["score"]:.1f})')
             
-            # 绘制实际数据点
-            ax.scatter(sizes, times, color='red', s=50, zorder=5, 
-                      label='实测数据', alpha=0.7)
-            
-            # 尝试不同复杂度模型的拟合
-            try:
-                # n log n 拟合
-                popt_log, pcov_log = curve_fit(n_log_n, sizes, times, 
-                                             p0=[1e-7, 0], maxfev=5000)
-                sizes_fit = np.linspace(min(sizes), max(sizes), 100)
-                times_fit_log = n_log_n(sizes_fit, *popt_log)
-                
-                # 计算R²
-                residuals_log = times - n_log_n(sizes, *popt_log)
-                ss_res_log = np.sum(residuals_log**2)
-                ss_tot_log = np.sum((times - np.mean(times))**2)
-                r_squared_log = 1 - (ss_res_log / ss_tot_log)
-                
-                ax.plot(sizes_fit, times_fit_log, 'b-', linewidth=2,
-                       label=f'n log n 拟合 (R² = {r_squared_log:.4f})')
-                
-                # 尝试n²拟合对比
-                try:
-                    popt_sq, pcov_sq = curve_fit(n_squared, sizes, times, 
-                                               p0=[1e-9, 0], maxfev=5000)
-                    times_fit_sq = n_squared(sizes_fit, *popt_sq)
-                    
-                    residuals_sq = times - n_squared(sizes, *popt_sq)
-                    ss_res_sq = np.sum(residuals_sq**2)
-                    r_squared_sq = 1 - (ss_res_sq / ss_tot_log)
-                    
-                    ax.plot(sizes_fit, times_fit_sq, 'g--', linewidth=1,
-                           label=f'n² 拟合 (R² = {r_squared_sq:.4f})', alpha=0.7)
-                except:
-                    pass
-                
-            except Exception as e:
-                print(f"拟合失败 {algo}: {e}")
-                # 直接绘制连线
-                ax.plot(sizes, times, 'b-', linewidth=1, label='实测趋势')
-            
-            ax.set_title(f'{algo}\n理论复杂度: {self.theoretical_complexity[algo]}', 
+            ax.set_title(f'{algo}\n理论复杂度: {self.theoretical_complexity.get(algo, "未知")}', 
                         fontweight='bold')
             ax.set_xlabel('数据规模 n')
             ax.set_ylabel('执行时间 (秒)')
@@ -264,11 +237,28 @@ class SortingPerformanceAnalyzer:
             ax.legend(fontsize=8)
             ax.grid(True, alpha=0.3)
         
+        for j in range(len(algorithms), rows * cols):
+            axes[j // cols, j % cols].set_visible(False)
+        
         plt.tight_layout()
         plt.savefig('../results/complexity_analysis.pdf', bbox_inches='tight', dpi=300)
         plt.savefig('../results/complexity_analysis.png', bbox_inches='tight', dpi=300)
         plt.show()
     
+    def capacity_planning(self, target_sizes=(10**6, 10**7, 10**8)):
+        """外推执行时间和内存峰值到目标规模 (bootstrap 置信区间)"""
+        if self.df is None:
+            return
+        
+        plan = complexity_fitting.capacity_plan(self.df, list(target_sizes))
+        if plan.empty:
+            print("⚠️  数据规模不足，无法进行容量规划")
+            return
+        
+        print("\n📈 容量规划 (O2, 95% 置信区间):")
+        print(plan.to_string(index=False, float_format=lambda v: f'{v:.4g}'))
+        plan.to_csv('../results/capacity_planning.csv', index=False)
+    
     def plot_parallel_efficiency(self):
         """并行效率分析"""
         if self.df is None:
@@ -368,6 +358,7 @@ class SortingPerformanceAnalyzer:
         self.plot_optimization_impact()
         self.plot_algorithm_comparison()
         self.theoretical_complexity_analysis()
+        self.capacity_planning()
         self.plot_parallel_efficiency()
         self.generate_comprehensive_report()
         
@@ -379,6 +370,7 @@ class SortingPerformanceAnalyzer:
         print("   - parallel_efficiency.pdf/png (并行效率)")
         print("📈 数据文件:")
         print("   - sorting_performance_analysis.xlsx (完整数据分析)")
+        print("   - capacity_planning.csv (容量规划外推)")
         print("   - performance_data.csv (原始数据)")
 
 def main():
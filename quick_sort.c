@@ -49,15 +49,22 @@ int partition(int arr[], int low, int high, PerformanceStats *stats) {
     return i + 1;
 }
 
-// 递归快速排序
-void quick_sort_recursive(int arr[], int low, int high, PerformanceStats *stats) {
+// 递归快速排序 (带递归深度，用于跟踪)
+static void quick_sort_recursive_depth(int arr[], int low, int high, PerformanceStats *stats, int depth) {
     if (low < high) {
+        TRACE_BEGIN(TRACE_PARTITION, depth, high - low + 1);
         int pi = partition(arr, low, high, stats);
-        quick_sort_recursive(arr, low, pi - 1, stats);
-        quick_sort_recursive(arr, pi + 1, high, stats);
+        TRACE_END(TRACE_PARTITION, depth, high - low + 1);
+        quick_sort_recursive_depth(arr, low, pi - 1, stats, depth + 1);
+        quick_sort_recursive_depth(arr, pi + 1, high, stats, depth + 1);
     }
 }
 
+// 递归快速排序
+void quick_sort_recursive(int arr[], int low, int high, PerformanceStats *stats) {
+    quick_sort_recursive_depth(arr, low, high, stats, 0);
+}
+
 // 栈操作函数
 Stack* create_stack(int capacity) {
     Stack *stack = (Stack*)malloc(sizeof(Stack));
@@ -72,11 +79,12 @@ void push(Stack *stack, int left, int right) {
         stack->top++;
         stack->items[stack->top].left = left;
         stack->items[stack->top].right = right;
+        stack->items[stack->top].depth = 0;
     }
 }
 
 StackItem pop(Stack *stack) {
-    StackItem item = {-1, -1};
+    StackItem item = {-1, -1, 0};
     if (stack->top >= 0) {
         item = stack->items[stack->top];
         stack->top--;
@@ -93,31 +101,43 @@ void free_stack(Stack *stack) {
     free(stack);
 }
 
+// 压栈并记录区间的递归深度
+static void push_depth(Stack *stack, int left, int right, int depth) {
+    push(stack, left, right);
+    stack->items[stack->top].depth = depth;
+}
+
 // 非递归快速排序
 void quick_sort_non_recursive(int arr[], int low, int high, PerformanceStats *stats) {
     if (high - low <= 0) return;
     
     Stack *stack = create_stack(high - low + 1);
+    long long stack_bytes = sizeof(Stack) + (long long)(high - low + 1) * sizeof(StackItem);
+    record_memory_alloc(stats, stack_bytes);
     push(stack, low, high);
     
     while (!is_empty(stack)) {
         StackItem item = pop(stack);
         int l = item.left;
         int r = item.right;
+        int d = item.depth;
         
         if (l < r) {
+            TRACE_BEGIN(TRACE_PARTITION, d, r - l + 1);
             int pi = partition(arr, l, r, stats);
+            TRACE_END(TRACE_PARTITION, d, r - l + 1);
             
             // 先压入较大的分区，减少栈深度
             if (pi - l > r - pi) {
-                push(stack, l, pi - 1);
-                push(stack, pi + 1, r);
+                push_depth(stack, l, pi - 1, d + 1);
+                push_depth(stack, pi + 1, r, d + 1);
             } else {
-                push(stack, pi + 1, r);
-                push(stack, l, pi - 1);
+                push_depth(stack, pi + 1, r, d + 1);
+                push_depth(stack, l, pi - 1, d + 1);
             }
         }
     }
     
     free_stack(stack);
+    record_memory_free(stats, stack_bytes);
 }
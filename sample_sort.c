@@ -0,0 +1,185 @@
+#include "sort_algorithms.h"
+
+// 简单的xorshift随机数，用于抽样 (rand()不是线程安全且会干扰测试数据生成)
+static unsigned int xorshift32(unsigned int *state) {
+    unsigned int x = *state;
+    x ^= x << 13;
+    x ^= x >> 17;
+    x ^= x << 5;
+    *state = x;
+    return x;
+}
+
+// 查找元素所属的桶
+// 分割点已去重，第j个分割点对应等值桶2j+1，相邻分割点之间为普通桶2j
+static int find_bucket(const int splitters[], int num_splitters, int value, long long *comparisons) {
+    int lo = 0, hi = num_splitters;
+    while (lo < hi) {
+        int mid = lo + (hi - lo) / 2;
+        (*comparisons)++;
+        if (value < splitters[mid]) {
+            hi = mid;
+        } else {
+            lo = mid + 1;
+        }
+    }
+    // lo为第一个大于value的分割点
+    (*comparisons)++;
+    if (lo > 0 && splitters[lo - 1] == value) return 2 * lo - 1;
+    return 2 * lo;
+}
+
+// 并行样本排序 (记录各阶段耗时)
+// 1. 过采样选择分割点  2. 各线程对自己的数据块分桶计数
+// 3. 一次全局交换把元素写入各桶的连续区间  4. 各桶用顺序快速排序并写回
+// 每个分割点单独有一个等值桶，重复键集中在等值桶中，等值桶无需排序
+void sample_sort_parallel_phased(int arr[], int left, int right, PerformanceStats *stats,
+                                 SampleSortPhases *phases) {
+    int n = right - left + 1;
+    if (phases) memset(phases, 0, sizeof(SampleSortPhases));
+
+    // 小数组直接使用顺序快速排序
+    if (n < SAMPLE_SORT_THRESHOLD) {
+        double start = omp_get_wtime();
+        quick_sort_hybrid(arr, left, right, stats);
+        if (phases) {
+            phases->local_sort = omp_get_wtime() - start;
+            phases->threads = 1;
+            phases->buckets = 1;
+        }
+        return;
+    }
+
+    int *a = arr + left;
+    int num_blocks = omp_get_max_threads();
+    int range_buckets = num_blocks * SAMPLE_SORT_BUCKETS_PER_THREAD;
+    if (range_buckets > SAMPLE_SORT_MAX_RANGE_BUCKETS) range_buckets = SAMPLE_SORT_MAX_RANGE_BUCKETS;
+
+    // 阶段1：过采样选择分割点，相同的分割点只保留一个
+    double t0 = omp_get_wtime();
+
+    int num_samples = range_buckets * SAMPLE_SORT_OVERSAMPLING;
+    int *samples = (int*)malloc(num_samples * sizeof(int));
+    int *splitters = (int*)malloc((range_buckets - 1) * sizeof(int));
+    long long samples_bytes = (long long)num_samples * sizeof(int);
+    long long splitters_bytes = (long long)(range_buckets - 1) * sizeof(int);
+    record_memory_alloc(stats, samples_bytes + splitters_bytes);
+    unsigned int seed = 2463534242u;
+    for (int i = 0; i < num_samples; i++) {
+        samples[i] = a[xorshift32(&seed) % n];
+    }
+    quick_sort_hybrid(samples, 0, num_samples - 1, NULL);
+    int num_splitters = 0;
+    for (int j = 0; j < range_buckets - 1; j++) {
+        int candidate = samples[(j + 1) * SAMPLE_SORT_OVERSAMPLING];
+        if (num_splitters == 0 || splitters[num_splitters - 1] != candidate) {
+            splitters[num_splitters++] = candidate;
+        }
+    }
+    free(samples);
+    record_memory_free(stats, samples_bytes);
+    int num_buckets = 2 * num_splitters + 1;
+
+    // 阶段2：各线程对自己的数据块分桶计数，记录每个元素所属桶
+    double t1 = omp_get_wtime();
+
+    unsigned short *bucket_of = (unsigned short*)malloc(n * sizeof(unsigned short));
+    long long *counts = (long long*)calloc((size_t)num_blocks * num_buckets, sizeof(long long));
+    long long classify_bytes = (long long)n * sizeof(unsigned short) +
+                               (long long)num_blocks * num_buckets * sizeof(long long);
+    record_memory_alloc(stats, classify_bytes);
+    long long classify_comparisons = 0;
+
+    #pragma omp parallel for schedule(static) reduction(+:classify_comparisons)
+    for (int b = 0; b < num_blocks; b++) {
+        int begin = (int)((long long)n * b / num_blocks);
+        int end = (int)((long long)n * (b + 1) / num_blocks);
+        long long *block_counts = counts + (size_t)b * num_buckets;
+
+        for (int i = begin; i < end; i++) {
+            int bucket = find_bucket(splitters, num_splitters, a[i], &classify_comparisons);
+            bucket_of[i] = (unsigned short)bucket;
+            block_counts[bucket]++;
+        }
+    }
+
+    // 阶段3：全局交换 — 计算每个(数据块, 桶)的写入位置后一次性分散写入临时数组
+    double t2 = omp_get_wtime();
+
+    long long *bucket_start = (long long*)malloc((num_buckets + 1) * sizeof(long long));
+    long long exchange_bytes = (long long)(num_buckets + 1) * sizeof(long long) + (long long)n * sizeof(int);
+    record_memory_alloc(stats, exchange_bytes);
+    long long offset = 0;
+    for (int k = 0; k < num_buckets; k++) {
+        bucket_start[k] = offset;
+        for (int b = 0; b < num_blocks; b++) {
+            long long c = counts[(size_t)b * num_buckets + k];
+            counts[(size_t)b * num_buckets + k] = offset;  // 复用为写入位置
+            offset += c;
+        }
+    }
+    bucket_start[num_buckets] = offset;
+
+    int *tmp = (int*)malloc(n * sizeof(int));
+
+    #pragma omp parallel for schedule(static)
+    for (int b = 0; b < num_blocks; b++) {
+        int begin = (int)((long long)n * b / num_blocks);
+        int end = (int)((long long)n * (b + 1) / num_blocks);
+        long long *write_pos = counts + (size_t)b * num_buckets;
+
+        for (int i = begin; i < end; i++) {
+            tmp[write_pos[bucket_of[i]]++] = a[i];
+        }
+    }
+
+    // 阶段4：各普通桶使用顺序快速排序 (递归深度有界)，动态调度以平衡桶大小差异
+    double t3 = omp_get_wtime();
+
+    long long sort_comparisons = 0, sort_swaps = 0;
+
+    #pragma omp parallel for schedule(dynamic, 1) reduction(+:sort_comparisons, sort_swaps)
+    for (int k = 0; k < num_buckets; k++) {
+        int start = (int)bucket_start[k];
+        int length = (int)(bucket_start[k + 1] - bucket_start[k]);
+        if (length == 0) continue;
+
+        PerformanceStats local;
+        init_performance_stats(&local);
+        if (k % 2 == 0) {
+            quick_sort_hybrid(tmp + start, 0, length - 1, stats ? &local : NULL);
+        }
+        memcpy(a + start, tmp + start, length * sizeof(int));
+
+        sort_comparisons += local.comparisons;
+        sort_swaps += local.swaps;
+    }
+
+    double t4 = omp_get_wtime();
+
+    if (stats) {
+        stats->comparisons += classify_comparisons + sort_comparisons;
+        stats->swaps += n + sort_swaps;  // 交换阶段每个元素移动一次
+    }
+
+    if (phases) {
+        phases->sampling = t1 - t0;
+        phases->classification = t2 - t1;
+        phases->exchange = t3 - t2;
+        phases->local_sort = t4 - t3;
+        phases->threads = num_blocks;
+        phases->buckets = num_buckets;
+    }
+
+    free(tmp);
+    free(bucket_start);
+    free(counts);
+    free(bucket_of);
+    free(splitters);
+    record_memory_free(stats, splitters_bytes + classify_bytes + exchange_bytes);
+}
+
+// 并行样本排序
+void sample_sort_parallel(int arr[], int left, int right, PerformanceStats *stats) {
+    sample_sort_parallel_phased(arr, left, right, stats, NULL);
+}
@@ -7,10 +7,25 @@
 #include <time.h>
 #include <omp.h>
 
+// 批量排序参数
+#define BATCH_INSERTION_THRESHOLD 24   // 混合快速排序中不超过该长度的子区间使用插入排序
+#define BATCH_CHUNK_SEGMENTS 16        // 动态调度每次分配的段数
+
+// 样本排序参数
+#define SAMPLE_SORT_THRESHOLD 16384        // 小于该规模直接使用顺序快速排序
+#define SAMPLE_SORT_BUCKETS_PER_THREAD 8   // 每个线程对应的桶数，多于线程数便于动态负载均衡
+#define SAMPLE_SORT_OVERSAMPLING 32        // 每个桶的采样数
+#define SAMPLE_SORT_MAX_RANGE_BUCKETS 32768 // 加上等值桶共不超过65535个，桶编号以unsigned short存储
+
+// 跟踪参数
+#define TRACE_MAX_THREADS 256               // 最多跟踪的线程数
+#define TRACE_DEFAULT_CAPACITY (1 << 20)    // 每个线程环形缓冲区的事件数
+
 // 栈结构用于非递归快速排序
 typedef struct {
     int left;
     int right;
+    int depth;  // 区间对应的递归深度 (用于跟踪)
 } StackItem;
 
 typedef struct {
@@ -24,9 +39,43 @@ typedef struct {
     double time;
     long long comparisons;
     long long swaps;
-    long long memory_usage;
+    long long memory_usage;   // 累计分配的临时内存 (字节)
+    long long memory_in_use;  // 当前占用的临时内存 (字节)
+    long long peak_memory;    // 临时内存峰值 (字节)
 } PerformanceStats;
 
+// 样本排序各阶段耗时
+typedef struct {
+    double sampling;
+    double classification;
+    double exchange;
+    double local_sort;
+    int threads;
+    int buckets;
+} SampleSortPhases;
+
+// 跟踪事件
+typedef enum {
+    TRACE_PARTITION = 0,
+    TRACE_MERGE = 1
+} TraceKind;
+
+typedef struct {
+    double timestamp;
+    int kind;
+    char phase;  // 'B'进入, 'E'退出
+    int depth;
+    int size;
+    int tid;
+} TraceEvent;
+
+// 跟踪点：未开启跟踪时只有一次全局标志判断
+extern int trace_enabled;
+#define TRACE_BEGIN(kind, depth, size) \
+    do { if (trace_enabled) trace_record((kind), 'B', (depth), (size)); } while (0)
+#define TRACE_END(kind, depth, size) \
+    do { if (trace_enabled) trace_record((kind), 'E', (depth), (size)); } while (0)
+
 // 函数声明
 // 快速排序
 void quick_sort_recursive(int arr[], int low, int high, PerformanceStats *stats);
@@ -39,6 +88,16 @@ void merge_sort_sequential(int arr[], int left, int right, PerformanceStats *sta
 void merge_sort_parallel(int arr[], int left, int right, PerformanceStats *stats);
 void merge(int arr[], int left, int mid, int right, PerformanceStats *stats);
 
+// 样本排序
+void sample_sort_parallel(int arr[], int left, int right, PerformanceStats *stats);
+void sample_sort_parallel_phased(int arr[], int left, int right, PerformanceStats *stats,
+                                 SampleSortPhases *phases);
+
+// 批量排序
+void insertion_sort(int arr[], int low, int high, PerformanceStats *stats);
+void quick_sort_hybrid(int arr[], int low, int high, PerformanceStats *stats);
+void sort_segments(int values[], const long long offsets[], int num_segments, PerformanceStats *stats);
+
 // 栈操作
 Stack* create_stack(int capacity);
 void push(Stack *stack, int left, int right);
@@ -46,6 +105,13 @@ StackItem pop(Stack *stack);
 int is_empty(Stack *stack);
 void free_stack(Stack *stack);
 
+// 跟踪
+void trace_enable(int capacity);
+void trace_disable(void);
+void trace_free(void);
+void trace_record(int kind, char phase, int depth, int size);
+int trace_export_chrome(const char *filename);
+
 // 工具函数
 void generate_test_data(const char *filename, int count, int data_type);
 void read_test_data(const char *filename, int arr[], int *count);
@@ -54,5 +120,7 @@ int is_sorted(int arr[], int size);
 void copy_array(int dest[], int src[], int size);
 void init_performance_stats(PerformanceStats *stats);
 void print_performance_stats(const PerformanceStats *stats, const char *algorithm_name);
+void record_memory_alloc(PerformanceStats *stats, long long bytes);
+void record_memory_free(PerformanceStats *stats, long long bytes);
 
 #endif
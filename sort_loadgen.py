@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+排序服务负载生成器
+启动多个并发客户端向本地排序服务发送小/大混合请求，
+统计客户端延迟分位数与吞吐量，并输出服务端指标
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from sort_service import DEFAULT_SOCKET, ELEMENT_BYTES, SortClient
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+def is_sorted(buffer, count):
+    values = buffer[:count * ELEMENT_BYTES].cast('i')
+    try:
+        return all(values[i - 1] <= values[i] for i in range(1, count))
+    finally:
+        values.release()
+
+
+async def run_client(args, latencies, rng):
+    """单个客户端：顺序发送 requests 个请求，数据每次随机生成"""
+    client = await SortClient(args.socket, capacity=args.large_size).connect()
+    elements = 0
+    failures = 0
+    try:
+        for _ in range(args.requests):
+            if rng.random() < args.large_fraction:
+                count = args.large_size
+            else:
+                count = rng.randint(args.small_min, args.small_max)
+            client.shm.buf[:count * ELEMENT_BYTES] = os.urandom(count * ELEMENT_BYTES)
+
+            start = time.perf_counter()
+            await client.sort(count)
+            latencies.append(time.perf_counter() - start)
+            elements += count
+
+            if args.verify and not is_sorted(client.shm.buf, count):
+                failures += 1
+    finally:
+        await client.close()
+    return elements, failures
+
+
+async def run(args):
+    latencies = []
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        run_client(args, latencies, random.Random(rng.random())) for _ in range(args.clients)
+    ])
+    elapsed = time.perf_counter() - start
+
+    total_requests = len(latencies)
+    total_elements = sum(elements for elements, _ in results)
+    failures = sum(failed for _, failed in results)
+    latencies.sort()
+
+    print("=== 排序服务负载测试 ===")
+    print(f"客户端: {args.clients}, 每客户端请求: {args.requests}, "
+          f"大请求比例: {args.large_fraction:.0%} ({args.large_size} 元素)")
+    print(f"总耗时: {elapsed:.3f} 秒")
+    print(f"吞吐量: {total_requests / elapsed:.1f} 请求/秒, {total_elements / elapsed:.3e} 元素/秒")
+    print(f"客户端延迟 (ms): p50={percentile(latencies, 50) * 1000:.3f} "
+          f"p95={percentile(latencies, 95) * 1000:.3f} p99={percentile(latencies, 99) * 1000:.3f}")
+    if args.verify:
+        print(f"排序正确: {'是' if failures == 0 else f'否 ({failures} 个请求失败)'}")
+
+    client = await SortClient(args.socket, capacity=1).connect()
+    try:
+        metrics = await client.metrics()
+    finally:
+        await client.close()
+    print("\n📈 服务端指标:")
+    for key, value in metrics.items():
+        print(f"  {key:<16} {value:.4g}" if isinstance(value, float) else f"  {key:<16} {value}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='排序服务负载生成器')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=1000, help='每个客户端的请求数')
+    parser.add_argument('--small-min', type=int, default=16)
+    parser.add_argument('--small-max', type=int, default=4096)
+    parser.add_argument('--large-size', type=int, default=1000000)
+    parser.add_argument('--large-fraction', type=float, default=0.01)
+    parser.add_argument('--verify', action='store_true', help='检查每个请求的排序结果')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"❌ 无法连接排序服务: {args.socket}，请先运行 sort_service.py")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+本地排序服务
+常驻进程加载排序内核 (libsort.so)，通过 Unix 域套接字接收请求，
+数据经共享内存传递，套接字上只传输 JSON 控制消息:
+小请求合并为一批调用 sort_segments，大请求交给独立内核进程中的 OpenMP 并行内核，
+并提供延迟与吞吐量指标
+
+内核进程崩溃 (例如段错误) 时只有当前请求失败，返回 "sort kernel process crashed" 错误，
+该请求的共享内存数据可能处于部分排序状态；服务随即启动新的内核进程，继续处理后续请求
+"""
+
+import argparse
+import asyncio
+import ctypes
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from multiprocessing import resource_tracker, shared_memory
+
+DEFAULT_SOCKET = '/tmp/sort_service.sock'
+DEFAULT_LIBRARY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'libsort.so')
+
+ELEMENT_BYTES = ctypes.sizeof(ctypes.c_int)
+MAX_COUNT = 2 ** 31 - 1  # 内核以 int 表示下标
+
+# 大请求可选的并行内核
+LARGE_KERNELS = {
+    'quick': 'quick_sort_hybrid',
+    'merge': 'merge_sort_parallel',
+    'sample': 'sample_sort_parallel',
+}
+
+
+def attach_shared_memory(name):
+    """
+    连接客户端创建的共享内存段
+    服务端不拥有该段，需从 resource_tracker 注销，否则退出时会被误删
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+class SortKernels:
+    """libsort.so 的 ctypes 封装 (ctypes 调用期间释放 GIL)"""
+
+    def __init__(self, library=DEFAULT_LIBRARY):
+        self.library = library
+        self.lib = ctypes.CDLL(library)
+        for symbol in LARGE_KERNELS.values():
+            func = getattr(self.lib, symbol)
+            func.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+            func.restype = None
+        self.lib.sort_segments.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int,
+                                           ctypes.c_void_p]
+        self.lib.sort_segments.restype = None
+
+    def sort(self, buffer, count, algorithm='sample', offset=0):
+        """对缓冲区 offset 字节处的 count 个 int 原地排序"""
+        array = (ctypes.c_int * count).from_buffer(buffer, offset)
+        getattr(self.lib, LARGE_KERNELS[algorithm])(ctypes.addressof(array), 0, count - 1, None)
+        del array
+
+    def sort_batch(self, views):
+        """把多个小数组拷贝到一个紧凑缓冲区，一次调用 sort_segments 后写回"""
+        offsets = (ctypes.c_longlong * (len(views) + 1))()
+        for i, view in enumerate(views):
+            offsets[i + 1] = offsets[i] + len(view) // ELEMENT_BYTES
+
+        packed = (ctypes.c_int * offsets[len(views)])()
+        packed_view = memoryview(packed).cast('B')
+        for i, view in enumerate(views):
+            packed_view[offsets[i] * ELEMENT_BYTES:offsets[i + 1] * ELEMENT_BYTES] = view
+
+        self.lib.sort_segments(ctypes.addressof(packed), ctypes.addressof(offsets), len(views), None)
+
+        for i, view in enumerate(views):
+            view[:] = packed_view[offsets[i] * ELEMENT_BYTES:offsets[i + 1] * ELEMENT_BYTES]
+
+
+# 内核进程中的排序内核，由 _init_kernel_process 加载
+_process_kernels = None
+
+
+def _init_kernel_process(library):
+    """
+    内核进程初始化：加载排序内核
+    内核进程使用自己的 resource_tracker，避免与服务进程对同一共享内存段的
+    注册/注销交错 (Python 3.13 以下 attach_shared_memory 需要先注册再注销)；
+    Ctrl-C 会向整个进程组发送 SIGINT，内核进程忽略它，由服务进程的 shutdown() 结束
+    """
+    global _process_kernels
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if sys.version_info < (3, 13):
+        resource_tracker._resource_tracker._fd = None
+    _process_kernels = SortKernels(library)
+
+
+def _sort_in_kernel_process(name, offset, count, algorithm):
+    """在内核进程中连接共享内存段并原地排序，用完立即关闭"""
+    shm = attach_shared_memory(name)
+    try:
+        _process_kernels.sort(shm.buf, count, algorithm, offset)
+    finally:
+        shm.close()
+    return count
+
+
+class ServiceMetrics:
+    """请求计数、延迟分位数与吞吐量"""
+
+    def __init__(self, window=10000):
+        self.start_time = time.monotonic()
+        self.requests = 0
+        self.small_requests = 0
+        self.large_requests = 0
+        self.errors = 0
+        self.kernel_crashes = 0
+        self.kernel_restarts = 0
+        self.elements = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.latencies = deque(maxlen=window)
+
+    def record(self, count, latency, batched):
+        self.requests += 1
+        self.elements += count
+        self.latencies.append(latency)
+        if batched:
+            self.small_requests += 1
+        else:
+            self.large_requests += 1
+
+    def snapshot(self):
+        elapsed = time.monotonic() - self.start_time
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000
+
+        return {
+            'uptime_s': elapsed,
+            'requests': self.requests,
+            'small_requests': self.small_requests,
+            'large_requests': self.large_requests,
+            'errors': self.errors,
+            'kernel_crashes': self.kernel_crashes,
+            'kernel_restarts': self.kernel_restarts,
+            'elements': self.elements,
+            'batches': self.batches,
+            'avg_batch_size': self.batched_requests / self.batches if self.batches else 0.0,
+            'requests_per_s': self.requests / elapsed if elapsed > 0 else 0.0,
+            'elements_per_s': self.elements / elapsed if elapsed > 0 else 0.0,
+            'latency_ms_p50': percentile(50),
+            'latency_ms_p95': percentile(95),
+            'latency_ms_p99': percentile(99),
+        }
+
+
+class SortService:
+    """
+    排序服务
+    所有内核调用在同一个工作线程中串行执行，
+    保证任意时刻只有一个 OpenMP 并行区域占用线程池
+
+    小请求的批量排序 (sort_segments) 在服务进程内执行：每段不超过 small_threshold，
+    内核递归深度有界；大请求由工作线程转交给单独的内核进程，
+    内核进程崩溃不会影响服务进程，只使当前请求失败并重启内核进程
+    """
+
+    def __init__(self, kernels, small_threshold=4096, max_batch=256, max_delay=0.0005,
+                 default_algorithm='sample'):
+        self.kernels = kernels
+        self.small_threshold = small_threshold
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.default_algorithm = default_algorithm
+        self.segments = {}  # 共享内存段名称 -> [SharedMemory, 引用该段的连接数]
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sort-kernel')
+        self.kernel_process = self._start_kernel_process()
+        self.batch_queue = asyncio.Queue()
+        self.metrics = ServiceMetrics()
+
+    def _start_kernel_process(self):
+        return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_init_kernel_process,
+                                   initargs=(self.kernels.library,))
+
+    def _restart_kernel_process(self):
+        self.metrics.kernel_restarts += 1
+        self.kernel_process.shutdown(wait=False)
+        self.kernel_process = self._start_kernel_process()
+
+    def _sort_large(self, name, offset, count, algorithm):
+        """
+        在工作线程中调用：提交给内核进程并等待完成
+        提交时内核进程已退出 (例如空闲时被 OOM 终止)，请求尚未发送，重启后重新提交一次；
+        只有排序过程中崩溃才使请求失败
+        """
+        try:
+            future = self.kernel_process.submit(_sort_in_kernel_process, name, offset, count, algorithm)
+        except BrokenProcessPool:
+            self._restart_kernel_process()
+            future = self.kernel_process.submit(_sort_in_kernel_process, name, offset, count, algorithm)
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            self.metrics.kernel_crashes += 1
+            self._restart_kernel_process()
+            raise RuntimeError('sort kernel process crashed; the request data may be '
+                               'partially sorted, the kernel process has been restarted')
+
+    def _acquire_segment(self, name, segments):
+        """连接共享内存段并记入当前连接使用的段集合，同一连接只计一次引用"""
+        entry = self.segments.get(name)
+        if entry is None:
+            entry = self.segments[name] = [attach_shared_memory(name), 0]
+        if name not in segments:
+            segments.add(name)
+            entry[1] += 1
+        return entry[0]
+
+    def _release_segments(self, segments):
+        """连接断开时释放其使用的共享内存段，没有连接引用的段立即关闭"""
+        for name in segments:
+            entry = self.segments.get(name)
+            if entry is None:
+                continue
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self.segments[name]
+                try:
+                    entry[0].close()
+                except BufferError:
+                    pass  # 仍有未完成的请求引用该段，由垃圾回收释放
+        segments.clear()
+
+    def _validate(self, request, segments):
+        """检查请求参数，返回 (共享内存段, 偏移, 元素数)"""
+        count = int(request['count'])
+        offset = int(request.get('offset', 0))
+        if not 0 <= count <= MAX_COUNT:
+            raise ValueError(f'count must be in [0, {MAX_COUNT}], got {count}')
+        if offset < 0 or offset % ELEMENT_BYTES:
+            raise ValueError(f'offset must be a non-negative multiple of {ELEMENT_BYTES}, got {offset}')
+        shm = self._acquire_segment(request['shm'], segments)
+        end = offset + count * ELEMENT_BYTES
+        if end > shm.size:
+            raise ValueError(f'request [{offset}, {end}) exceeds shared memory size {shm.size}')
+        return shm, offset, count
+
+    async def _batcher(self):
+        """收集小请求：等到 max_batch 个或 max_delay 超时后作为一批提交"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.batch_queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                if not self.batch_queue.empty():
+                    batch.append(self.batch_queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.batch_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            views = [view for view, _ in batch]
+            try:
+                await loop.run_in_executor(self.executor, self.kernels.sort_batch, views)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+            self.metrics.batches += 1
+            self.metrics.batched_requests += len(batch)
+
+    async def _sort(self, request, segments):
+        shm, offset, count = self._validate(request, segments)
+        if count <= 1:
+            return False
+        if count <= self.small_threshold:
+            view = shm.buf[offset:offset + count * ELEMENT_BYTES]
+            try:
+                future = asyncio.get_running_loop().create_future()
+                await self.batch_queue.put((view, future))
+                await future
+                return True
+            finally:
+                view.release()
+
+        algorithm = request.get('algorithm', self.default_algorithm)
+        if algorithm not in LARGE_KERNELS:
+            raise ValueError(f'unknown algorithm: {algorithm}')
+        await asyncio.get_running_loop().run_in_executor(
+            self.executor, self._sort_large, request['shm'], offset, count, algorithm)
+        return False
+
+    async def _handle_request(self, request, segments):
+        op = request.get('op')
+        if op == 'ping':
+            return {'ok': True}
+        if op == 'metrics':
+            return {'ok': True, 'metrics': self.metrics.snapshot()}
+        if op != 'sort':
+            raise ValueError(f'unknown op: {op}')
+
+        start = time.perf_counter()
+        batched = await self._sort(request, segments)
+        latency = time.perf_counter() - start
+        self.metrics.record(int(request['count']), latency, batched)
+        return {'ok': True, 'server_time': latency, 'batched': batched}
+
+    async def _serve_request(self, line, writer, write_lock, segments):
+        request = {}
+        try:
+            request = json.loads(line)
+            response = await self._handle_request(request, segments)
+        except Exception as e:
+            self.metrics.errors += 1
+            response = {'ok': False, 'error': str(e)}
+        if 'id' in request:
+            response['id'] = request['id']
+        async with write_lock:
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+
+    async def handle_client(self, reader, writer):
+        """
+        每个连接可以有多个未完成的请求，响应通过 id 对应
+        连接使用过的共享内存段在连接断开时关闭，服务端不会长期占用客户端的共享内存
+        """
+        write_lock = asyncio.Lock()
+        tasks = set()
+        segments = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.create_task(self._serve_request(line, writer, write_lock, segments))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self._release_segments(segments)
+            writer.close()
+
+    async def serve(self, socket_path):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        batcher = asyncio.create_task(self._batcher())
+        server = await asyncio.start_unix_server(self.handle_client, path=socket_path)
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        # 预先启动内核进程，避免第一个大请求承担进程启动开销
+        pid = await loop.run_in_executor(None, lambda: self.kernel_process.submit(os.getpid).result())
+        print(f"✅ 排序服务已启动: {socket_path} (内核进程 {pid})")
+        async with server:
+            await stop.wait()
+
+        batcher.cancel()
+        self.executor.shutdown(wait=True)
+        self.kernel_process.shutdown(wait=True)
+        for shm, _ in self.segments.values():
+            shm.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        print("\n📈 服务指标:")
+        for key, value in self.metrics.snapshot().items():
+            print(f"  {key:<16} {value:.4g}" if isinstance(value, float) else f"  {key:<16} {value}")
+
+
+class SortClient:
+    """
+    排序服务客户端
+    每个客户端拥有一个共享内存段，sort_array 把数据写入后请求服务端原地排序
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, capacity=1 << 20):
+        self.socket_path = socket_path
+        self.capacity = capacity
+        self.shm = None
+        self.reader = None
+        self.writer = None
+        self.next_id = 0
+        self.pending = {}
+        self.receiver = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_unix_connection(self.socket_path)
+        self.shm = shared_memory.SharedMemory(create=True, size=self.capacity * ELEMENT_BYTES)
+        self.receiver = asyncio.create_task(self._receive())
+        return self
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            await self.writer.wait_closed()
+        if self.receiver:
+            self.receiver.cancel()
+        if self.shm:
+            self.shm.close()
+            self.shm.unlink()
+
+    async def _receive(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self.pending.pop(response.get('id'), None)
+            if future and not future.done():
+                future.set_result(response)
+        for future in self.pending.values():
+            future.set_exception(ConnectionError('sort service closed the connection'))
+
+    async def request(self, **request):
+        self.next_id += 1
+        request['id'] = self.next_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[self.next_id] = future
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        await self.writer.drain()
+        response = await future
+        if not response.get('ok'):
+            raise RuntimeError(response.get('error'))
+        return response
+
+    async def sort(self, count, offset=0, algorithm=None):
+        """对自己共享内存段 [offset, offset + count) 中的数据原地排序"""
+        request = {'op': 'sort', 'shm': self.shm.name, 'offset': offset, 'count': count}
+        if algorithm:
+            request['algorithm'] = algorithm
+        return await self.request(**request)
+
+    async def sort_array(self, values, algorithm=None):
+        """排序一个 array('i') 并返回排序结果"""
+        count = len(values)
+        if count > self.capacity:
+            raise ValueError(f'array of {count} elements exceeds client capacity {self.capacity}')
+        self.shm.buf[:count * ELEMENT_BYTES] = values.tobytes()
+        await self.sort(count, algorithm=algorithm)
+        result = type(values)(values.typecode)
+        result.frombytes(bytes(self.shm.buf[:count * ELEMENT_BYTES]))
+        return result
+
+    async def metrics(self):
+        return (await self.request(op='metrics'))['metrics']
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='本地排序服务')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    parser.add_argument('--lib', default=DEFAULT_LIBRARY, help='排序内核共享库')
+    parser.add_argument('--small-threshold', type=int, default=4096,
+                        help='不超过该元素数的请求合并批量排序')
+    parser.add_argument('--max-batch', type=int, default=256, help='每批最多请求数')
+    parser.add_argument('--max-delay-ms', type=float, default=0.5, help='批量等待时间 (毫秒)')
+    parser.add_argument('--algorithm', choices=sorted(LARGE_KERNELS), default='sample',
+                        help='大请求默认使用的并行内核')
+    args = parser.parse_args()
+
+    try:
+        kernels = SortKernels(args.lib)
+    except OSError as e:
+        print(f"❌ 无法加载排序内核 {args.lib}: {e}")
+        print("请先编译: gcc -O2 -fopenmp -shared -fPIC -o libsort.so "
+              "quick_sort.c merge_sort.c sample_sort.c batch_sort.c trace.c utils.c")
+        return
+
+    service = SortService(kernels, args.small_threshold, args.max_batch,
+                          args.max_delay_ms / 1000, args.algorithm)
+    asyncio.run(service.serve(args.socket))
+
+
+if __name__ == "__main__":
+    main()
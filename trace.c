@@ -0,0 +1,108 @@
+#include "sort_algorithms.h"
+
+// 每个线程一个环形缓冲区，写满后覆盖最早的事件
+typedef struct {
+    TraceEvent *events;
+    long long count;  // 累计写入的事件数
+} TraceBuffer;
+
+int trace_enabled = 0;
+
+static TraceBuffer trace_buffers[TRACE_MAX_THREADS];
+static int trace_capacity = TRACE_DEFAULT_CAPACITY;
+static int trace_num_threads = 0;
+static double trace_base_time = 0.0;
+
+// 线程编号在线程第一次记录事件时分配，嵌套并行区域中的线程也各不相同
+static _Thread_local int trace_tid = -1;
+
+static const char *trace_kind_names[] = {"partition", "merge"};
+
+// 开启跟踪并清空已有事件，capacity为每个线程的环形缓冲区容量 (<=0使用原容量)
+void trace_enable(int capacity) {
+    if (capacity > 0 && capacity != trace_capacity) {
+        trace_free();
+        trace_capacity = capacity;
+    }
+    for (int t = 0; t < TRACE_MAX_THREADS; t++) {
+        trace_buffers[t].count = 0;
+    }
+    trace_base_time = omp_get_wtime();
+    trace_enabled = 1;
+}
+
+// 关闭跟踪，保留已记录的事件以便导出
+void trace_disable(void) {
+    trace_enabled = 0;
+}
+
+// 释放所有缓冲区
+void trace_free(void) {
+    trace_enabled = 0;
+    for (int t = 0; t < TRACE_MAX_THREADS; t++) {
+        free(trace_buffers[t].events);
+        trace_buffers[t].events = NULL;
+        trace_buffers[t].count = 0;
+    }
+}
+
+// 记录一个事件 (由TRACE_BEGIN/TRACE_END宏调用)
+void trace_record(int kind, char phase, int depth, int size) {
+    if (trace_tid < 0) {
+        int tid;
+        #pragma omp atomic capture
+        tid = trace_num_threads++;
+        trace_tid = tid;
+    }
+    if (trace_tid >= TRACE_MAX_THREADS) return;
+
+    TraceBuffer *buffer = &trace_buffers[trace_tid];
+    if (buffer->events == NULL) {
+        buffer->events = (TraceEvent*)malloc(trace_capacity * sizeof(TraceEvent));
+        if (buffer->events == NULL) return;
+    }
+
+    TraceEvent *event = &buffer->events[buffer->count % trace_capacity];
+    event->timestamp = omp_get_wtime();
+    event->kind = kind;
+    event->phase = phase;
+    event->depth = depth;
+    event->size = size;
+    event->tid = trace_tid;
+    buffer->count++;
+}
+
+// 导出为Chrome Trace Event格式 (可在chrome://tracing或Perfetto中打开)
+int trace_export_chrome(const char *filename) {
+    FILE *file = fopen(filename, "w");
+    if (file == NULL) {
+        printf("Error opening trace file for writing!\n");
+        return -1;
+    }
+
+    fprintf(file, "{\"displayTimeUnit\":\"ms\",\"traceEvents\":[\n");
+    int first = 1;
+    long long dropped = 0;
+    for (int t = 0; t < TRACE_MAX_THREADS; t++) {
+        TraceBuffer *buffer = &trace_buffers[t];
+        if (buffer->events == NULL || buffer->count == 0) continue;
+
+        // 缓冲区写满后从最早的未被覆盖事件开始输出
+        long long start = buffer->count > trace_capacity ? buffer->count - trace_capacity : 0;
+        dropped += start;
+        for (long long i = start; i < buffer->count; i++) {
+            const TraceEvent *event = &buffer->events[i % trace_capacity];
+            fprintf(file, "%s{\"name\":\"%s\",\"cat\":\"sort\",\"ph\":\"%c\",\"ts\":%.3f,"
+                    "\"pid\":0,\"tid\":%d,\"args\":{\"depth\":%d,\"size\":%d}}",
+                    first ? "" : ",\n", trace_kind_names[event->kind], event->phase,
+                    (event->timestamp - trace_base_time) * 1e6, event->tid,
+                    event->depth, event->size);
+            first = 0;
+        }
+    }
+    fprintf(file, "\n],\"otherData\":{\"droppedEvents\":%lld}}\n", dropped);
+
+    fclose(file);
+    printf("Trace saved to %s\n", filename);
+    return 0;
+}
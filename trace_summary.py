@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+跟踪数据汇总
+读取排序内核导出的 Chrome Trace Event JSON，输出递归深度直方图、
+各递归层级耗时、线程间负载不均衡，并可导出火焰图折叠栈数据
+"""
+
+import argparse
+import json
+from collections import defaultdict
+
+
+def load_spans(filename):
+    """
+    读取跟踪文件并按线程配对 B/E 事件
+    环形缓冲区覆盖可能导致事件不成对，未配对的事件被忽略
+    返回 (spans, 丢弃事件数)，每个 span 包含 name、tid、depth、size、start、duration (微秒)
+    """
+    with open(filename, encoding='utf-8') as f:
+        trace = json.load(f)
+
+    events = trace['traceEvents'] if isinstance(trace, dict) else trace
+    dropped = trace.get('otherData', {}).get('droppedEvents', 0) if isinstance(trace, dict) else 0
+
+    by_thread = defaultdict(list)
+    for event in events:
+        if event.get('ph') in ('B', 'E'):
+            by_thread[event['tid']].append(event)
+
+    spans = []
+    for tid, thread_events in by_thread.items():
+        thread_events.sort(key=lambda e: e['ts'])
+        stack = []
+        for event in thread_events:
+            if event['ph'] == 'B':
+                stack.append(event)
+                continue
+            # 弹出与之匹配的进入事件 (同名同深度)
+            while stack and (stack[-1]['name'] != event['name'] or
+                             stack[-1]['args']['depth'] != event['args']['depth']):
+                stack.pop()
+            if not stack:
+                continue
+            begin = stack.pop()
+            spans.append({
+                'name': begin['name'],
+                'tid': tid,
+                'depth': begin['args']['depth'],
+                'size': begin['args']['size'],
+                'start': begin['ts'],
+                'duration': event['ts'] - begin['ts'],
+            })
+    return spans, dropped
+
+
+def depth_histogram(spans):
+    """每种调用在各递归深度的调用次数"""
+    histogram = defaultdict(lambda: defaultdict(int))
+    for span in spans:
+        histogram[span['name']][span['depth']] += 1
+    return histogram
+
+
+def time_per_level(spans):
+    """每种调用在各递归深度的总耗时 (微秒) 与平均区间大小"""
+    levels = defaultdict(lambda: defaultdict(lambda: {'time': 0.0, 'calls': 0, 'elements': 0}))
+    for span in spans:
+        level = levels[span['name']][span['depth']]
+        level['time'] += span['duration']
+        level['calls'] += 1
+        level['elements'] += span['size']
+    return levels
+
+
+def thread_load(spans):
+    """
+    每个线程的忙碌时间 (微秒) 与调用次数
+    返回 (线程统计, 不均衡度 max/mean)
+    """
+    load = defaultdict(lambda: {'time': 0.0, 'calls': 0})
+    for span in spans:
+        load[span['tid']]['time'] += span['duration']
+        load[span['tid']]['calls'] += 1
+    busy = [stat['time'] for stat in load.values()]
+    mean = sum(busy) / len(busy) if busy else 0.0
+    imbalance = max(busy) / mean if mean > 0 else 1.0
+    return load, imbalance
+
+
+def folded_stacks(spans):
+    """
+    火焰图折叠栈格式: 线程;调用;depth_0;...;depth_d 权重(微秒)，可直接交给 flamegraph.pl
+    partition/merge 区间本身不包含子调用，其耗时即为该层的自身耗时，
+    因此每层递归作为上一层的子帧，火焰图中每一帧的宽度为该深度及更深层的总耗时
+    """
+    weights = defaultdict(float)
+    for span in spans:
+        frames = ';'.join(f"depth_{depth}" for depth in range(span['depth'] + 1))
+        weights[f"T{span['tid']};{span['name']};{frames}"] += span['duration']
+    return [f"{stack} {int(round(weight))}" for stack, weight in sorted(weights.items())]
+
+
+def _bar(value, maximum, width=40):
+    return '#' * (int(round(width * value / maximum)) if maximum > 0 else 0)
+
+
+def print_summary(spans, dropped):
+    """打印汇总报告"""
+    print(f"配对调用数: {len(spans)}")
+    if dropped:
+        print(f"⚠️  环形缓冲区覆盖了 {dropped} 个最早的事件，结果只包含最近的事件")
+    if not spans:
+        return
+
+    print("\n📊 递归深度直方图:")
+    for name, counts in depth_histogram(spans).items():
+        print(f"  {name}:")
+        maximum = max(counts.values())
+        for depth in sorted(counts):
+            print(f"    深度 {depth:>3}  {counts[depth]:>8}  {_bar(counts[depth], maximum)}")
+
+    print("\n⏱️  各层级耗时:")
+    for name, levels in time_per_level(spans).items():
+        print(f"  {name}:")
+        print(f"    {'深度':>4} {'调用次数':>8} {'总耗时(ms)':>11} {'平均区间':>8}")
+        for depth in sorted(levels):
+            level = levels[depth]
+            print(f"    {depth:>6} {level['calls']:>12} {level['time'] / 1000:>14.3f} "
+                  f"{level['elements'] / level['calls']:>12.1f}")
+
+    load, imbalance = thread_load(spans)
+    print("\n🧵 线程负载:")
+    maximum = max(stat['time'] for stat in load.values())
+    for tid in sorted(load):
+        stat = load[tid]
+        print(f"  线程 {tid:>3}  {stat['time'] / 1000:>10.3f} ms  {stat['calls']:>8} 次  "
+              f"{_bar(stat['time'], maximum)}")
+    print(f"  负载不均衡度 (最大/平均): {imbalance:.2f}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='排序内核跟踪数据汇总')
+    parser.add_argument('trace', help='Chrome Trace Event JSON 文件 (例如 ../results/trace_MergeSort_Parallel_100000.json)')
+    parser.add_argument('--folded', help='导出火焰图折叠栈文件')
+    args = parser.parse_args()
+
+    try:
+        spans, dropped = load_spans(args.trace)
+    except FileNotFoundError:
+        print(f"❌ 跟踪文件不存在: {args.trace}")
+        return
+
+    print_summary(spans, dropped)
+
+    if args.folded:
+        with open(args.folded, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(folded_stacks(spans)) + '\n')
+        print(f"\n✅ 折叠栈数据已保存为 '{args.folded}'")
+
+
+if __name__ == "__main__":
+    main()
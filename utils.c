@@ -6,6 +6,31 @@ void init_performance_stats(PerformanceStats *stats) {
     stats->comparisons = 0;
     stats->swaps = 0;
     stats->memory_usage = 0;
+    stats->memory_in_use = 0;
+    stats->peak_memory = 0;
+}
+
+// 记录临时内存分配，同时更新累计分配量与峰值 (并行区域中可安全调用)
+void record_memory_alloc(PerformanceStats *stats, long long bytes) {
+    if (!stats) return;
+    long long in_use, peak;
+    #pragma omp atomic
+    stats->memory_usage += bytes;
+    #pragma omp atomic capture
+    in_use = stats->memory_in_use += bytes;
+    #pragma omp atomic read
+    peak = stats->peak_memory;
+    if (in_use > peak) {
+        #pragma omp critical(peak_memory)
+        if (in_use > stats->peak_memory) stats->peak_memory = in_use;
+    }
+}
+
+// 记录临时内存释放
+void record_memory_free(PerformanceStats *stats, long long bytes) {
+    if (!stats) return;
+    #pragma omp atomic
+    stats->memory_in_use -= bytes;
 }
 
 // 打印性能统计
@@ -15,6 +40,7 @@ void print_performance_stats(const PerformanceStats *stats, const char *algorith
     printf("Comparisons: %lld\n", stats->comparisons);
     printf("Swaps: %lld\n", stats->swaps);
     printf("Memory Usage: %lld bytes\n", stats->memory_usage);
+    printf("Peak Memory: %lld bytes\n", stats->peak_memory);
     printf("\n");
 }
 